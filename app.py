@@ -4,19 +4,33 @@ VEO Dialogue Generator - Flask Backend
 Main backend server integrating all components.
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
 import sys
+import json
+import queue
+import atexit
 import base64
+import logging
+import gzip
+import hashlib
+import secrets
 import tempfile
-from datetime import datetime
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 
 # Import custom modules
-from resume_parser import ResumeParser
-from master_builder import MasterJSONBuilder
+from groq_client import get_groq_client
+from resume_parser import ResumeParser, PROMPT_VERSION, FOCUS_BUILDERS
+from master_builder import MasterJSONBuilder, dump_json
 from clip_generator import ClipJSONGenerator
+from response_cache import ResponseCache
 
 # Load environment variables
 load_dotenv()
@@ -25,12 +39,24 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)
 
+# Logging: request threads only enqueue records, a listener thread writes them out.
+# Set LOG_LEVEL=WARNING in production to skip INFO records entirely.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+log_queue = queue.SimpleQueue()
+logging.basicConfig(
+    level=LOG_LEVEL,
+    format='%(asctime)s %(levelname)s %(name)s: %(message)s',
+    handlers=[QueueHandler(log_queue)]
+)
+log_listener = QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+atexit.register(log_listener.stop)
+logger = logging.getLogger(__name__)
+
 # Configuration
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 if not GROQ_API_KEY:
-    print("⚠️  WARNING: GROQ_API_KEY not found in .env file!")
-    print("Please create a .env file with your Groq API key:")
-    print("GROQ_API_KEY=your_api_key_here")
+    logger.warning("⚠️  GROQ_API_KEY not found in .env file! Add GROQ_API_KEY=your_api_key_here")
 
 # Create necessary directories
 UPLOAD_FOLDER = 'uploads'
@@ -38,41 +64,302 @@ OUTPUT_FOLDER = 'outputs'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
-# Initialize components
-resume_parser = ResumeParser(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
-master_builder = MasterJSONBuilder(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
-clip_generator = ClipJSONGenerator(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+# Groq retries 429/5xx responses with exponential backoff
+GROQ_MAX_RETRIES = 3
+
+# Request size limits: reject oversized bodies before parsing or decoding them
+MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+MAX_REFERENCE_IMAGE_BYTES = 10 * 1024 * 1024
+MAX_REFERENCE_IMAGE_BASE64_CHARS = 4 * -(-MAX_REFERENCE_IMAGE_BYTES // 3)
+app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+
+# Uploaded and generated files are deleted after 24 hours (checked hourly)
+FILE_RETENTION_SECONDS = 24 * 3600
+CLEANUP_INTERVAL_SECONDS = 3600
+
+# Uploads are copied to disk in 1 MiB chunks (Werkzeug defaults to 16 KiB)
+UPLOAD_BUFFER_SIZE = 1 << 20
+
+# Saved master/clip files are pretty-printed by default; set
+# PRETTY_JSON_OUTPUT=false in production for smaller, faster compact output
+OUTPUT_JSON_INDENT = 2 if os.getenv('PRETTY_JSON_OUTPUT', 'true').lower() == 'true' else None
+
+# Resume uploads below this size are parsed in memory without a temp file
+IN_MEMORY_UPLOAD_BYTES = 4 * 1024 * 1024
+
+# Base64 images are decoded in chunks of this many characters (multiple of 4)
+BASE64_CHUNK_SIZE = 64 * 1024
+
+# Persistent cache for parsed resumes (keyed by file hash + parser prompt version)
+# and for the extraction LLM calls (keyed by request hash)
+CACHE_DB_PATH = os.getenv('CACHE_DB_PATH', 'cache.db')
+response_cache = ResponseCache(db_path=CACHE_DB_PATH)
+
+# Initialize components (one shared Groq client keeps HTTPS connections alive across calls).
+# They are shared by all request and job threads: each holds only the client, cache and
+# model name, so keep per-request state in locals (or behind a lock) when extending them.
+groq_client = get_groq_client(GROQ_API_KEY, max_retries=GROQ_MAX_RETRIES) if GROQ_API_KEY else None
+resume_parser = ResumeParser(api_key=GROQ_API_KEY, client=groq_client, cache=response_cache) if GROQ_API_KEY else None
+master_builder = MasterJSONBuilder(api_key=GROQ_API_KEY, client=groq_client, cache=response_cache) if GROQ_API_KEY else None
+clip_generator = ClipJSONGenerator(api_key=GROQ_API_KEY, client=groq_client) if GROQ_API_KEY else None
+
+# Background generation jobs (in-process; poll /api/jobs/<job_id>)
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+JOB_TTL_SECONDS = 3600
+job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS)
+jobs = {}
+jobs_lock = threading.Lock()
+
+# Frontend UI, loaded once and served from memory with an ETag
+INDEX_FILE = os.path.join(app.root_path, 'index_premium_final.html')
+with open(INDEX_FILE, 'rb') as f:
+    INDEX_BYTES = f.read()
+INDEX_GZIP_BYTES = gzip.compress(INDEX_BYTES)
+INDEX_ETAG = hashlib.md5(INDEX_BYTES).hexdigest()
+
+# Fixed JSON payloads, serialized once at startup
+TEST_RESPONSE_BYTES = json.dumps({
+    'success': True,
+    'groq_api_configured': GROQ_API_KEY is not None,
+    'components_initialized': {
+        'resume_parser': resume_parser is not None,
+        'master_builder': master_builder is not None,
+        'clip_generator': clip_generator is not None
+    },
+    'message': 'Backend is ready!' if GROQ_API_KEY else 'Please configure GROQ_API_KEY in .env'
+}).encode('utf-8')
+NOT_FOUND_BYTES = json.dumps({'success': False, 'error': 'Endpoint not found'}).encode('utf-8')
+INTERNAL_ERROR_BYTES = json.dumps({'success': False, 'error': 'Internal server error'}).encode('utf-8')
+REQUEST_TOO_LARGE_BYTES = json.dumps({
+    'success': False,
+    'error': f'Request too large (max {MAX_CONTENT_LENGTH // (1024 * 1024)}MB)'
+}).encode('utf-8')
 
 
 # ============ HELPER FUNCTIONS ============
 
 def save_base64_image(base64_string: str, filename: str) -> str:
     """
-    Saves base64 image to file.
+    Saves base64 image to file, decoding in fixed-size chunks.
     """
     try:
-        # Remove data URL prefix if present
-        if ',' in base64_string:
-            base64_string = base64_string.split(',')[1]
+        # Skip data URL prefix if present, and drop any whitespace (spaces, CR, LF)
+        # since it would break the 4-character alignment of every chunk
+        start = base64_string.find(',') + 1
+        base64_string = ''.join(base64_string[start:].split())
         
-        # Decode and save
-        image_data = base64.b64decode(base64_string)
+        # Decode and save chunk by chunk (chunk size is a multiple of 4)
         filepath = os.path.join(UPLOAD_FOLDER, filename)
         
         with open(filepath, 'wb') as f:
-            f.write(image_data)
+            for i in range(0, len(base64_string), BASE64_CHUNK_SIZE):
+                f.write(base64.b64decode(base64_string[i:i + BASE64_CHUNK_SIZE]))
         
         return filepath
     except Exception as e:
         raise Exception(f"Error saving image: {str(e)}")
 
 
+def unique_timestamp() -> str:
+    """
+    Returns a filename stamp: 13-digit epoch milliseconds + 8 random hex chars.
+    Unlike a per-second date string, concurrent requests never collide.
+    """
+    return f"{int(time.time() * 1000):013d}_{secrets.token_hex(4)}"
+
+
+def hash_file(filepath: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_generation_request():
+    """
+    Reads /api/generate parameters (multipart or JSON) and saves the reference image.
+    Returns (params, None) on success or (None, error_response).
+    """
+    # Multipart requests carry the image as a raw file part;
+    # JSON requests carry it as a base64 string (deprecated)
+    is_multipart = request.mimetype == 'multipart/form-data'
+    data = request.form if is_multipart else request.get_json()
+    image_file = request.files.get('reference_image') if is_multipart else None
+    
+    # Validate required fields
+    required_fields = ['content_description', 'reference_image']
+    for field in required_fields:
+        if field not in data and not (field == 'reference_image' and image_file):
+            return None, (jsonify({
+                'success': False,
+                'error': f'Missing required field: {field}'
+            }), 400)
+    
+    # Extract parameters
+    content_description = data['content_description']
+    voice_tone = data.get('voice_tone', 'professional')
+    speed = data.get('speed', '1x')
+    if is_multipart:
+        num_clips = data.get('num_clips', 3, type=int)
+        background_music = data.get('background_music', 'false').lower() == 'true'
+    else:
+        num_clips = data.get('num_clips', 3)
+        background_music = data.get('background_music', False)
+    
+    logger.info("🎬 Generating video JSONs: clips=%s speed=%s tone=%s music=%s",
+                num_clips, speed, voice_tone, background_music)
+    
+    # Save reference image
+    timestamp = unique_timestamp()
+    image_filename = f"reference_{timestamp}.jpg"
+    if image_file:
+        image_path = os.path.join(UPLOAD_FOLDER, image_filename)
+        image_file.save(image_path, buffer_size=UPLOAD_BUFFER_SIZE)
+    else:
+        logger.warning("⚠️  Base64 reference_image is deprecated, send it as a multipart file instead")
+        reference_image = data['reference_image']
+        if len(reference_image) - (reference_image.find(',') + 1) > MAX_REFERENCE_IMAGE_BASE64_CHARS:
+            return None, (jsonify({
+                'success': False,
+                'error': f'Reference image too large (max {MAX_REFERENCE_IMAGE_BYTES // (1024 * 1024)}MB)'
+            }), 413)
+        image_path = save_base64_image(reference_image, image_filename)
+    
+    logger.info("📸 Reference image saved: %s", image_filename)
+    
+    return {
+        'content_description': content_description,
+        'image_path': image_path,
+        'voice_tone': voice_tone,
+        'speed': speed,
+        'num_clips': num_clips,
+        'background_music': background_music,
+        'timestamp': timestamp
+    }, None
+
+
+def run_generation(
+    content_description: str,
+    image_path: str,
+    voice_tone: str,
+    speed: str,
+    num_clips: int,
+    background_music: bool,
+    timestamp: str
+) -> dict:
+    """
+    Builds master.json and clip JSONs, saves them to OUTPUT_FOLDER.
+    """
+    # Step 1: Build master JSON
+    logger.info("🏗️  Building master JSON...")
+    master_json = master_builder.build_master(
+        user_description=content_description,
+        reference_image_path=image_path,
+        num_clips=num_clips,
+        speed=speed,
+        background_music=background_music,
+        user_tone=voice_tone,
+        background_preset="keep_original"
+    )
+    
+    # Step 2: Generate clip JSONs
+    logger.info("🎬 Generating clip JSONs...")
+    clip_jsons = clip_generator.generate_all_clips(
+        master_json=master_json,
+        user_description=content_description
+    )
+    
+    # Save JSONs to output folder (optional), writing files concurrently
+    master_output_path = os.path.join(OUTPUT_FOLDER, f'master_{timestamp}.json')
+    
+    def write_clip(index, clip):
+        clip_output_path = os.path.join(OUTPUT_FOLDER, f'clip_{index + 1}_{timestamp}.json')
+        with open(clip_output_path, 'w', encoding='utf-8') as f:
+            f.write(dump_json(clip, OUTPUT_JSON_INDENT))
+    
+    with ThreadPoolExecutor(max_workers=min(8, len(clip_jsons) + 1)) as executor:
+        master_future = executor.submit(master_builder.save_master_json, master_json, master_output_path,
+                                        indent=OUTPUT_JSON_INDENT)
+        clip_futures = [executor.submit(write_clip, i, clip) for i, clip in enumerate(clip_jsons)]
+        for future in [master_future, *clip_futures]:
+            future.result()
+    
+    logger.info("✅ All JSONs generated successfully! master=%s clips=%d",
+                master_output_path, len(clip_jsons))
+    
+    return {
+        'master': master_json,
+        'clips': clip_jsons,
+        'message': f'Generated master.json and {len(clip_jsons)} clip JSONs'
+    }
+
+
+def run_generation_job(job_id: str, params: dict) -> None:
+    """
+    Runs run_generation in a worker thread and records the outcome in `jobs`.
+    """
+    with jobs_lock:
+        job = jobs.get(job_id)
+        if job is None:
+            return
+        job.update(status='running', updated_at=time.time())
+    
+    try:
+        result = run_generation(**params)
+        update = {'status': 'finished', 'result': result}
+    except Exception as e:
+        logger.exception("❌ Generation job %s failed: %s", job_id, e)
+        update = {'status': 'failed', 'error': str(e)}
+    
+    with jobs_lock:
+        job = jobs.get(job_id)
+        if job is not None:
+            job.update(update, updated_at=time.time())
+
+
 def cleanup_old_files():
     """
-    Cleanup old uploaded files (optional, run periodically).
+    Deletes uploaded and generated files older than FILE_RETENTION_SECONDS.
+    """
+    cutoff = time.time() - FILE_RETENTION_SECONDS
+    removed = 0
+    
+    for folder in (UPLOAD_FOLDER, OUTPUT_FOLDER):
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        removed += 1
+                except OSError:
+                    pass
+    
+    if removed:
+        logger.info("🧹 Removed %d old files", removed)
+
+
+def run_cleanup_loop():
+    """
+    Runs cleanup_old_files and purges expired cache entries now and then
+    every CLEANUP_INTERVAL_SECONDS.
     """
-    # Implementation: delete files older than 24 hours
-    pass
+    while True:
+        try:
+            cleanup_old_files()
+        except OSError as e:
+            logger.warning("⚠️  File cleanup failed: %s", e)
+        
+        purged = response_cache.purge_expired()
+        if purged:
+            logger.info("🧹 Purged %d expired cache entries", purged)
+        time.sleep(CLEANUP_INTERVAL_SECONDS)
+
+
+threading.Thread(target=run_cleanup_loop, name='file-cleanup', daemon=True).start()
 
 
 # ============ API ENDPOINTS ============
@@ -82,7 +369,16 @@ def index():
     """
     Serve the main application UI.
     """
-    return send_from_directory('.', 'index_premium_final.html')
+    use_gzip = 'gzip' in request.accept_encodings
+    
+    response = Response(INDEX_GZIP_BYTES if use_gzip else INDEX_BYTES, mimetype='text/html')
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    response.set_etag(f"{INDEX_ETAG}-gzip" if use_gzip else INDEX_ETAG)
+    response.cache_control.max_age = 300
+    
+    return response.make_conditional(request)
 
 
 @app.route('/api/parse-resume', methods=['POST'])
@@ -112,23 +408,45 @@ def parse_resume():
                 'error': 'No file selected'
             }), 400
         
-        # Save file temporarily
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"resume_{timestamp}_{file.filename}"
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
+        # Small uploads are parsed straight from memory; larger ones are
+        # spooled to disk first
+        content_length = request.content_length
+        if content_length is not None and content_length < IN_MEMORY_UPLOAD_BYTES:
+            file_bytes = file.read()
+            filepath = None
+            logger.info("📄 Parsing resume in memory: %s", file.filename)
+            input_hash = hashlib.sha256(file_bytes).hexdigest()
+        else:
+            timestamp = unique_timestamp()
+            filename = f"resume_{timestamp}_{file.filename}"
+            filepath = os.path.join(UPLOAD_FOLDER, filename)
+            file.save(filepath, buffer_size=UPLOAD_BUFFER_SIZE)
+            logger.info("📄 Parsing resume: %s", filename)
+            input_hash = hash_file(filepath)
         
-        print(f"📄 Parsing resume: {filename}")
+        # Return cached result if this exact file was parsed before
+        cached_data = response_cache.get(input_hash, PROMPT_VERSION)
+        if cached_data is not None:
+            logger.info("⚡ Cache hit for resume (%s)", input_hash[:12])
+            return jsonify({
+                'success': True,
+                'data': cached_data,
+                'message': 'Resume parsed successfully'
+            })
         
         # Parse resume
-        resume_data = resume_parser.parse_file(filepath)
+        if filepath is None:
+            resume_data = resume_parser.parse_bytes(file_bytes, file.filename)
+        else:
+            resume_data = resume_parser.parse_file(filepath)
         
         if resume_data.get('is_fallback'):
-            print(f"⚠️  Resume parsed with FALLBACK data (AI extraction failed)")
-            if resume_data.get('warnings'):
-                print(f"   Warnings: {resume_data['warnings']}")
+            logger.warning("⚠️  Resume parsed with FALLBACK data (AI extraction failed): %s",
+                           resume_data.get('warnings'))
         else:
-            print(f"✅ Resume parsed successfully")
+            logger.info("✅ Resume parsed successfully")
+            # Only cache real AI extractions, never fallback data
+            response_cache.set(input_hash, PROMPT_VERSION, resume_data)
         
         return jsonify({
             'success': True,
@@ -136,8 +454,10 @@ def parse_resume():
             'message': 'Resume parsed successfully'
         })
     
+    except RequestEntityTooLarge:
+        raise
     except Exception as e:
-        print(f"❌ Error parsing resume: {str(e)}")
+        logger.error("❌ Error parsing resume: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -165,17 +485,50 @@ def generate_description():
             }), 400
         
         resume_data = data['resume_data']
-        focus = data.get('focus', 'comprehensive')
         
-        print(f"✨ Generating video description (focus: {focus})")
+        # Optional 'focuses' list returns every requested variant in one call
+        focuses = data.get('focuses')
+        if focuses is not None and (
+            not isinstance(focuses, list) or not focuses
+            or not all(isinstance(focus, str) for focus in focuses)
+        ):
+            return jsonify({
+                'success': False,
+                'error': "'focuses' must be a non-empty list of strings"
+            }), 400
+        
+        requested = focuses if focuses is not None else [data.get('focus', 'comprehensive')]
+        if not isinstance(requested[0], str):
+            return jsonify({
+                'success': False,
+                'error': "'focus' must be a string"
+            }), 400
         
-        # Generate description
-        description = resume_parser.generate_video_description(
+        for focus in requested:
+            if focus not in FOCUS_BUILDERS:
+                return jsonify({
+                    'success': False,
+                    'error': f"Unknown focus '{focus}'. Use one of: {', '.join(FOCUS_BUILDERS)}"
+                }), 400
+        
+        logger.info("✨ Generating video description (focus: %s)", ', '.join(requested))
+        
+        # Generate descriptions
+        descriptions = resume_parser.generate_video_descriptions(
             resume_data=resume_data,
-            focus=focus
+            focuses=requested
         )
         
-        print(f"✅ Description generated ({len(description)} chars)")
+        if focuses is not None:
+            logger.info("✅ %d descriptions generated", len(descriptions))
+            return jsonify({
+                'success': True,
+                'descriptions': descriptions,
+                'message': 'Descriptions generated successfully'
+            })
+        
+        description = descriptions[requested[0]]
+        logger.info("✅ Description generated (%d chars)", len(description))
         
         return jsonify({
             'success': True,
@@ -183,8 +536,10 @@ def generate_description():
             'message': 'Description generated successfully'
         })
     
+    except RequestEntityTooLarge:
+        raise
     except Exception as e:
-        print(f"❌ Error generating description: {str(e)}")
+        logger.error("❌ Error generating description: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -203,121 +558,130 @@ def generate_video_jsons():
                 'error': 'GROQ_API_KEY not configured'
             }), 500
         
-        data = request.get_json()
+        params, error_response = read_generation_request()
+        if error_response:
+            return error_response
         
-        # Validate required fields
-        required_fields = ['content_description', 'reference_image']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({
-                    'success': False,
-                    'error': f'Missing required field: {field}'
-                }), 400
-        
-        # Extract parameters
-        content_description = data['content_description']
-        reference_image_base64 = data['reference_image']
-        voice_tone = data.get('voice_tone', 'professional')
-        speed = data.get('speed', '1x')
-        num_clips = data.get('num_clips', 3)
-        background_music = data.get('background_music', False)
-        
-        print(f"🎬 Generating video JSONs:")
-        print(f"   - Clips: {num_clips}")
-        print(f"   - Speed: {speed}")
-        print(f"   - Tone: {voice_tone}")
-        print(f"   - Music: {background_music}")
-        
-        # Save reference image
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        image_filename = f"reference_{timestamp}.jpg"
-        image_path = save_base64_image(reference_image_base64, image_filename)
+        result = run_generation(**params)
         
-        print(f"📸 Reference image saved: {image_filename}")
-        
-        # Step 1: Build master JSON
-        print("🏗️  Building master JSON...")
-        master_json = master_builder.build_master(
-            user_description=content_description,
-            reference_image_path=image_path,
-            num_clips=num_clips,
-            speed=speed,
-            background_music=background_music,
-            user_tone=voice_tone,
-            background_preset="keep_original"
-        )
-        
-        # Step 2: Generate clip JSONs
-        print("🎬 Generating clip JSONs...")
-        clip_jsons = clip_generator.generate_all_clips(
-            master_json=master_json,
-            user_description=content_description
-        )
+        return jsonify({
+            'success': True,
+            **result
+        })
+    
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        logger.exception("❌ Error generating JSONs: %s", e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/generate-async', methods=['POST'])
+def generate_video_jsons_async():
+    """
+    Endpoint 3b: Queue master.json and clip JSON generation, poll /api/jobs/<job_id>
+    """
+    try:
+        if not GROQ_API_KEY:
+            return jsonify({
+                'success': False,
+                'error': 'GROQ_API_KEY not configured'
+            }), 500
         
-        # Save JSONs to output folder (optional)
-        master_output_path = os.path.join(OUTPUT_FOLDER, f'master_{timestamp}.json')
-        master_builder.save_master_json(master_json, master_output_path)
+        params, error_response = read_generation_request()
+        if error_response:
+            return error_response
         
-        for i, clip in enumerate(clip_jsons):
-            clip_output_path = os.path.join(OUTPUT_FOLDER, f'clip_{i+1}_{timestamp}.json')
-            import json
-            with open(clip_output_path, 'w', encoding='utf-8') as f:
-                json.dump(clip, f, indent=2, ensure_ascii=False)
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with jobs_lock:
+            # Forget completed jobs nobody polled for a while (queued/running ones stay)
+            for old_id in [
+                jid for jid, job in jobs.items()
+                if job['status'] in ('finished', 'failed') and job['updated_at'] < now - JOB_TTL_SECONDS
+            ]:
+                del jobs[old_id]
+            jobs[job_id] = {'status': 'queued', 'result': None, 'error': None, 'updated_at': now}
         
-        print(f"✅ All JSONs generated successfully!")
-        print(f"   - Master: {master_output_path}")
-        print(f"   - Clips: {len(clip_jsons)} files")
+        job_executor.submit(run_generation_job, job_id, params)
+        logger.info("📬 Queued generation job: %s", job_id)
         
         return jsonify({
             'success': True,
-            'master': master_json,
-            'clips': clip_jsons,
-            'message': f'Generated master.json and {len(clip_jsons)} clip JSONs'
-        })
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/api/jobs/{job_id}'
+        }), 202
     
+    except RequestEntityTooLarge:
+        raise
     except Exception as e:
-        print(f"❌ Error generating JSONs: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.error("❌ Error queueing generation job: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """
+    Endpoint 3c: Status (and result when finished) of a queued generation job
+    """
+    with jobs_lock:
+        job = dict(jobs[job_id]) if job_id in jobs else None
+    
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    if job['status'] == 'failed':
+        return jsonify({
+            'success': False,
+            'job_id': job_id,
+            'status': 'failed',
+            'error': job['error']
+        })
+    
+    response = {
+        'success': True,
+        'job_id': job_id,
+        'status': job['status']
+    }
+    if job['status'] == 'finished':
+        response.update(job['result'])
+    
+    return jsonify(response)
+
+
 @app.route('/api/test', methods=['GET'])
 def test_endpoint():
     """
     Test endpoint to verify API key configuration
     """
-    return jsonify({
-        'success': True,
-        'groq_api_configured': GROQ_API_KEY is not None,
-        'components_initialized': {
-            'resume_parser': resume_parser is not None,
-            'master_builder': master_builder is not None,
-            'clip_generator': clip_generator is not None
-        },
-        'message': 'Backend is ready!' if GROQ_API_KEY else 'Please configure GROQ_API_KEY in .env'
-    })
+    return Response(TEST_RESPONSE_BYTES, mimetype='application/json')
 
 
 # ============ ERROR HANDLERS ============
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
-        'success': False,
-        'error': 'Endpoint not found'
-    }), 404
+    return Response(NOT_FOUND_BYTES, status=404, mimetype='application/json')
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(error):
+    return Response(REQUEST_TOO_LARGE_BYTES, status=413, mimetype='application/json')
 
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({
-        'success': False,
-        'error': 'Internal server error'
-    }), 500
+    return Response(INTERNAL_ERROR_BYTES, status=500, mimetype='application/json')
 
 
 # ============ MAIN ============
@@ -337,6 +701,8 @@ if __name__ == '__main__':
     print("   POST /api/parse-resume        - Parse resume file")
     print("   POST /api/generate-description - Generate video script")
     print("   POST /api/generate            - Generate master & clip JSONs")
+    print("   POST /api/generate-async      - Queue generation, returns job_id")
+    print("   GET  /api/jobs/<job_id>       - Poll a queued generation job")
     print("="*60 + "\n")
     
     if not GROQ_API_KEY:
@@ -346,9 +712,10 @@ if __name__ == '__main__':
         print("\nGet your API key from: https://console.groq.com/keys")
         print("="*60 + "\n")
     
-    # Run Flask app
+    # Run Flask app (threaded so slow Groq calls don't block other requests)
     app.run(
         host='0.0.0.0',
         port=5001,
-        debug=True
+        debug=True,
+        threaded=True
     )
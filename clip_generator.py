@@ -8,20 +8,137 @@ Generates individual clip JSONs with structured dialogue:
 """
 
 import json
-import copy
-import re
-from typing import Dict, Any, List, Optional
+import logging
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Any, List, Optional, Tuple
 from groq import Groq
+from groq_client import get_groq_client
 from rules import get_veo_prompt_requirements
 
 
+logger = logging.getLogger(__name__)
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Identical in every clip, so one instance is shared (read-only, only serialized)
+_DIALOGUE_COMPLETION_KEYFRAME = {
+    "time": 7.9,
+    "action": "dialogue_completion",
+    "properties": {
+        "description": "Dialogue must complete by this point",
+        "voice_level": "natural_completion",
+        "prepare_transition": True
+    }
+}
+
+# Accepted openings for the introduction clip
+_GREETINGS = ('hello', 'hi', 'hey', 'greetings')
+
+
+# Static dialogue instructions. Only the speed tier is interpolated, so the
+# system message is byte-identical across requests at the same speed and the
+# per-request details (name, role, clip count, content) go in the user message.
+DIALOGUE_SYSTEM_PROMPT_TEMPLATE = """
+You are an expert dialogue creator for video generation.
+You create structured dialogue hitting EXACT word counts. First segment MUST be introduction with person's name. Each segment must be {target_words} words (±{word_tolerance} words). Return ONLY valid JSON.
+
+YOUR TASK:
+Create one dialogue segment per clip (see NUMBER OF CLIPS) for the video. Each segment will be spoken in an 8-second clip.
+
+🔒 CRITICAL STRUCTURE RULES:
+
+CLIP 1 (INTRODUCTION - MANDATORY FORMAT):
+- MUST start with: "Hello, I'm <name>" or "Hi, I'm <name>" using the person's name
+- Follow with brief role/title introduction
+- Keep it warm and welcoming
+- Target: {target_words} words
+- Complete introduction only - NO content details yet
+
+CLIPS 2 ONWARD (CONTENT):
+- Cover the main content provided by the user
+- Build logically: overview → details → conclusion/call-to-action
+- Each segment: complete, substantial thoughts
+- Flow naturally between segments
+
+⏱️ TIMING REQUIREMENTS (CRITICAL):
+- Speed: {speed_label} ({words_per_second} words/second)
+- Each dialogue MUST complete within 7.9 seconds
+- Target words per clip: {target_words} words
+- Acceptable range: {min_words}-{max_words} words
+- At {words_per_second} words/sec, {target_words} words = ~{target_seconds:.1f} seconds
+- YOU MUST hit the target word count for perfect timing
+
+🎯 WORD COUNT PRECISION:
+- If speed is NORMAL (3.0 w/s): Use {target_words} words (completes in ~{normal_seconds:.1f}s)
+- If speed is ENERGETIC (4.5 w/s): Use {target_words} words (completes in ~{energetic_seconds:.1f}s)  
+- If speed is FAST (5.4 w/s): Use {target_words} words (completes in ~{fast_seconds:.1f}s)
+
+📝 DIALOGUE QUALITY:
+- Natural, conversational, professional tone
+- Complete sentences and thoughts
+- NO filler words ("um", "uh", "like", "you know")
+- Smooth transitions between clips
+- First-person perspective ("I", "my", "we")
+- Engaging and clear
+
+EXAMPLE STRUCTURE:
+
+For 3 clips at {speed_label} speed:
+{{
+  "segment_1": "Hello, I'm <name>, a <role>. I'm excited to share my journey and expertise with you today. Let me take you through what makes my experience unique and valuable.",
+  "segment_2": "[Cover main content points from description - {target_words} words]",
+  "segment_3": "[Conclude with impact/call-to-action - {target_words} words]"
+}}
+
+RETURN ONLY THIS JSON (no explanations):
+{{
+  "segment_1": "Introduction dialogue with exactly {target_words} words...",
+  "segment_2": "Content dialogue with exactly {target_words} words...",
+  "segment_3": "More content with exactly {target_words} words..."
+}}
+
+Add more segments for more clips. Use "segment_4", "segment_5", etc.
+
+CRITICAL: 
+- Return ONLY valid JSON
+- No markdown formatting
+- No extra text
+- Each segment must be {min_words}-{max_words} words
+- Segment 1 MUST be introduction with name
+""".strip()
+
+
+@lru_cache(maxsize=16)
+def _dialogue_system_prompt(
+    speed_label: str,
+    words_per_second: float,
+    min_words: int,
+    target_words: int,
+    max_words: int
+) -> str:
+    """Renders the dialogue system prompt once per speed tier."""
+    return DIALOGUE_SYSTEM_PROMPT_TEMPLATE.format(
+        speed_label=speed_label,
+        words_per_second=words_per_second,
+        min_words=min_words,
+        target_words=target_words,
+        max_words=max_words,
+        word_tolerance=max_words - target_words,
+        target_seconds=target_words / words_per_second,
+        normal_seconds=target_words / 3.0,
+        energetic_seconds=target_words / 4.5,
+        fast_seconds=target_words / 5.4
+    )
+
+
 class ClipJSONGenerator:
     """
     Generates clip JSONs with structured, speed-adaptive dialogue.
     """
     
-    def __init__(self, api_key: str, model: str = "llama-3.3-70b-versatile"):
-        self.client = Groq(api_key=api_key)
+    def __init__(self, api_key: str, model: str = "llama-3.3-70b-versatile", client: Optional[Groq] = None):
+        self.client = client or get_groq_client(api_key)
         self.model = model
     
     def generate_all_clips(
@@ -54,12 +171,12 @@ class ClipJSONGenerator:
         person_name = master_json["person_identity"]["name"]
         person_role = master_json["person_identity"]["role"]
         
-        print(f"⚡ Using speed: {speed_label} ({words_per_second} words/sec)")
-        print(f"📝 Target: {target_words} words per clip ({min_words}-{max_words} range)")
-        print(f"👤 Person: {person_name} - {person_role}")
+        logger.info("⚡ Using speed: %s (%s words/sec)", speed_label, words_per_second)
+        logger.info("📝 Target: %d words per clip (%d-%d range)", target_words, min_words, max_words)
+        logger.info("👤 Person: %s - %s", person_name, person_role)
         
         # Step 1: Segment description into structured dialogue
-        print(f"🎬 Generating structured dialogue for {num_clips} clips...")
+        logger.info("🎬 Generating structured dialogue for %d clips...", num_clips)
         dialogue_segments = self._generate_structured_dialogue(
             person_name=person_name,
             person_role=person_role,
@@ -72,28 +189,35 @@ class ClipJSONGenerator:
             speed_label=speed_label
         )
         
-        # Step 2: Generate clip JSONs
-        clips = []
-        previous_end_line = None
+        # Step 2: Generate clip JSONs (VEO prompt template is shared by all clips)
+        veo_prompt_template = self._build_veo_prompt_template(master_json)
         
-        for i in range(num_clips):
-            clip_num = i + 1
-            dialogue = dialogue_segments[i]
-            
-            print(f"🔨 Building Clip {clip_num} JSON...")
+        # Each clip's transitions use its own and the previous clip's last
+        # sentence; computing these once up front leaves no state carried
+        # between iterations (the final clip's ending is never needed)
+        last_sentences = [
+            self._get_last_sentence(dialogue) for dialogue in dialogue_segments[:num_clips - 1]
+        ]
+        previous_ends = [None] + last_sentences
+        next_cues = last_sentences + [None]
+        
+        clips = []
+        for clip_num, dialogue, previous_end, last_sentence in zip(
+            range(1, num_clips + 1), dialogue_segments, previous_ends, next_cues
+        ):
+            logger.debug("🔨 Building Clip %d JSON...", clip_num)
             clip = self.generate_clip(
                 clip_number=clip_num,
                 master_json=master_json,
                 dialogue_text=dialogue,
-                previous_clip_end=previous_end_line
+                previous_clip_end=previous_end,
+                veo_prompt_template=veo_prompt_template,
+                last_sentence=last_sentence
             )
             
             clips.append(clip)
-            
-            # Store end of this dialogue for next clip's transition
-            previous_end_line = self._get_last_sentence(dialogue)
         
-        print(f"✅ All {num_clips} clip JSONs generated!")
+        logger.info("✅ All %d clip JSONs generated!", num_clips)
         return clips
     
     def _generate_structured_dialogue(
@@ -113,80 +237,20 @@ class ClipJSONGenerator:
         CRITICAL: First clip MUST be introduction only.
         """
         
-        prompt = f"""
-You are an expert dialogue creator for video generation.
-
-PERSON INFORMATION:
-- Name: {person_name}
-- Role: {person_role}
-
-CONTENT TO COVER:
-{user_description}
-
-YOUR TASK:
-Create {num_clips} dialogue segments for video clips. Each segment will be spoken in an 8-second clip.
-
-🔒 CRITICAL STRUCTURE RULES:
-
-CLIP 1 (INTRODUCTION - MANDATORY FORMAT):
-- MUST start with: "Hello, I'm {person_name}" or "Hi, I'm {person_name}"
-- Follow with brief role/title introduction
-- Keep it warm and welcoming
-- Target: {target_words} words
-- Complete introduction only - NO content details yet
-
-CLIPS 2-{num_clips} (CONTENT):
-- Cover the main content from the description above
-- Build logically: overview → details → conclusion/call-to-action
-- Each segment: complete, substantial thoughts
-- Flow naturally between segments
-
-⏱️ TIMING REQUIREMENTS (CRITICAL):
-- Speed: {speed_label} ({words_per_second} words/second)
-- Each dialogue MUST complete within 7.9 seconds
-- Target words per clip: {target_words} words
-- Acceptable range: {min_words}-{max_words} words
-- At {words_per_second} words/sec, {target_words} words = ~{target_words/words_per_second:.1f} seconds
-- YOU MUST hit the target word count for perfect timing
-
-🎯 WORD COUNT PRECISION:
-- If speed is NORMAL (3.0 w/s): Use {target_words} words (completes in ~{target_words/3.0:.1f}s)
-- If speed is ENERGETIC (4.5 w/s): Use {target_words} words (completes in ~{target_words/4.5:.1f}s)  
-- If speed is FAST (5.4 w/s): Use {target_words} words (completes in ~{target_words/5.4:.1f}s)
-
-📝 DIALOGUE QUALITY:
-- Natural, conversational, professional tone
-- Complete sentences and thoughts
-- NO filler words ("um", "uh", "like", "you know")
-- Smooth transitions between clips
-- First-person perspective ("I", "my", "we")
-- Engaging and clear
-
-EXAMPLE STRUCTURE:
-
-For 3 clips at {speed_label} speed:
-{{
-  "segment_1": "Hello, I'm {person_name}, a {person_role}. I'm excited to share my journey and expertise with you today. Let me take you through what makes my experience unique and valuable.",
-  "segment_2": "[Cover main content points from description - {target_words} words]",
-  "segment_3": "[Conclude with impact/call-to-action - {target_words} words]"
-}}
-
-RETURN ONLY THIS JSON (no explanations):
-{{
-  "segment_1": "Introduction dialogue with exactly {target_words} words...",
-  "segment_2": "Content dialogue with exactly {target_words} words...",
-  "segment_3": "More content with exactly {target_words} words..."
-}}
-
-Add more segments if num_clips > 3. Use "segment_4", "segment_5", etc.
-
-CRITICAL: 
-- Return ONLY valid JSON
-- No markdown formatting
-- No extra text
-- Each segment must be {min_words}-{max_words} words
-- Segment 1 MUST be introduction with name
-"""
+        # A single clip is just the fixed introduction, so skip the LLM call
+        if num_clips == 1:
+            logger.info("🎬 Single clip requested, using standard introduction")
+            return self._fallback_structured_dialogue(
+                person_name, person_role, user_description, num_clips, target_words
+            )
+        
+        prompt = (
+            f"PERSON INFORMATION:\n"
+            f"- Name: {person_name}\n"
+            f"- Role: {person_role}\n\n"
+            f"NUMBER OF CLIPS: {num_clips}\n\n"
+            f"CONTENT TO COVER:\n{user_description}"
+        )
         
         try:
             response = self.client.chat.completions.create(
@@ -194,7 +258,9 @@ CRITICAL:
                 messages=[
                     {
                         "role": "system",
-                        "content": f"You create structured dialogue hitting EXACT word counts. First segment MUST be introduction with person's name. Each segment must be {target_words} words (±{max_words-target_words} words). Return ONLY valid JSON."
+                        "content": _dialogue_system_prompt(
+                            speed_label, words_per_second, min_words, target_words, max_words
+                        )
                     },
                     {
                         "role": "user",
@@ -202,12 +268,13 @@ CRITICAL:
                     }
                 ],
                 temperature=0.7,
-                max_tokens=2000
+                # ~2 tokens per word (with headroom) plus per-segment key and
+                # JSON overhead, instead of a flat 2000-token reservation
+                max_tokens=num_clips * (max_words + 8) * 2 + 128
             )
             
             raw_response = response.choices[0].message.content
-            cleaned = self._clean_json_response(raw_response)
-            segments_dict = json.loads(cleaned)
+            segments_dict = self._parse_json_response(raw_response)
             
             # Extract segments with validation
             segments = []
@@ -220,18 +287,18 @@ CRITICAL:
                     
                     # Validate first clip is introduction
                     if i == 1:
-                        if not any(greeting in segment.lower()[:20] for greeting in ['hello', 'hi', 'hey', 'greetings']):
-                            print(f"⚠️  Clip 1 missing greeting! Adding introduction...")
+                        if not segment.lstrip()[:20].lower().startswith(_GREETINGS):
+                            logger.warning("⚠️  Clip 1 missing greeting! Adding introduction...")
                             segment = f"Hello, I'm {person_name}. {segment}"
                             word_count = len(segment.split())
                     
                     # Check timing
                     if estimated_duration > 7.9:
-                        print(f"⚠️  Segment {i}: {word_count} words = {estimated_duration:.1f}s (TOO LONG, will cut at 7.9s)")
+                        logger.warning("⚠️  Segment %d: %d words = %.1fs (TOO LONG, will cut at 7.9s)", i, word_count, estimated_duration)
                     elif word_count < min_words:
-                        print(f"⚠️  Segment {i}: {word_count} words (target: {target_words}) - too short")
+                        logger.warning("⚠️  Segment %d: %d words (target: %d) - too short", i, word_count, target_words)
                     else:
-                        print(f"✅ Segment {i}: {word_count} words = {estimated_duration:.1f}s (perfect timing)")
+                        logger.info("✅ Segment %d: %d words = %.1fs (perfect timing)", i, word_count, estimated_duration)
                     
                     segments.append(segment)
                 else:
@@ -244,8 +311,7 @@ CRITICAL:
             return segments
             
         except Exception as e:
-            print(f"⚠️  Error generating dialogue: {e}")
-            print("Using fallback structured dialogue...")
+            logger.warning("⚠️  Error generating dialogue: %s. Using fallback structured dialogue...", e)
             return self._fallback_structured_dialogue(
                 person_name, person_role, user_description, num_clips, target_words
             )
@@ -273,11 +339,11 @@ CRITICAL:
             words = description.split()
             words_per_clip = len(words) // (num_clips - 1)
             
-            for i in range(1, num_clips):
-                start_idx = (i - 1) * words_per_clip
-                end_idx = i * words_per_clip if i < num_clips - 1 else len(words)
-                segment = ' '.join(words[start_idx:end_idx])
-                segments.append(segment)
+            # Consume the words in one pass; the last clip takes the remainder
+            word_iter = iter(words)
+            for _ in range(num_clips - 2):
+                segments.append(' '.join(islice(word_iter, words_per_clip)))
+            segments.append(' '.join(word_iter))
         
         return segments
     
@@ -286,7 +352,9 @@ CRITICAL:
         clip_number: int,
         master_json: Dict[str, Any],
         dialogue_text: str,
-        previous_clip_end: Optional[str] = None
+        previous_clip_end: Optional[str] = None,
+        veo_prompt_template: Optional[Tuple[str, ...]] = None,
+        last_sentence: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generates a single clip JSON.
@@ -297,7 +365,12 @@ CRITICAL:
         start_time = (clip_number - 1) * duration
         end_time = clip_number * duration
         
-        # Deep copy ALL settings from master
+        # Dialogue length is used by both the dialogue block and the VEO prompt
+        word_count = len(dialogue_text.split())
+        estimated_duration = word_count / master_json["timing_config"]["words_per_second"]
+        
+        # ALL settings come from master. Sections are shared by reference
+        # (read-only, only serialized) rather than deep-copied per clip
         clip = {
             "clip_metadata": {
                 "clip_number": clip_number,
@@ -308,13 +381,13 @@ CRITICAL:
             },
             
             # EXACT COPY from master
-            "person_identity": copy.deepcopy(master_json["person_identity"]),
-            "face_preservation": copy.deepcopy(master_json["face_preservation"]),
-            "lip_sync_config": copy.deepcopy(master_json["lip_sync_config"]),
-            "visual_settings": copy.deepcopy(master_json["visual_settings"]),
-            "audio_profile": copy.deepcopy(master_json["audio_profile"]),
-            "timing_config": copy.deepcopy(master_json["timing_config"]),
-            "transition_rules": copy.deepcopy(master_json["transition_rules"]),
+            "person_identity": master_json["person_identity"],
+            "face_preservation": master_json["face_preservation"],
+            "lip_sync_config": master_json["lip_sync_config"],
+            "visual_settings": master_json["visual_settings"],
+            "audio_profile": master_json["audio_profile"],
+            "timing_config": master_json["timing_config"],
+            "transition_rules": master_json["transition_rules"],
             
             # Reference to master
             "inherited_from_master": True,
@@ -323,8 +396,8 @@ CRITICAL:
             # DIALOGUE (changes per clip)
             "dialogue": {
                 "text": dialogue_text,
-                "word_count": len(dialogue_text.split()),
-                "estimated_duration_seconds": len(dialogue_text.split()) / master_json["timing_config"]["words_per_second"],
+                "word_count": word_count,
+                "estimated_duration_seconds": round(estimated_duration, 2),
                 "tone": master_json["person_identity"]["tone"],
                 "speaking_style": master_json["person_identity"]["speaking_style"],
                 "is_introduction": clip_number == 1
@@ -333,7 +406,9 @@ CRITICAL:
             # Transition handling
             "transition": {
                 "from_previous_clip": previous_clip_end if previous_clip_end else "Opening segment",
-                "to_next_clip": self._get_transition_cue(dialogue_text, clip_number, master_json["project_metadata"]["total_clips"]),
+                "to_next_clip": self._get_transition_cue(
+                    dialogue_text, clip_number, master_json["project_metadata"]["total_clips"], last_sentence
+                ),
                 "continuity_check": "verify_face_position_matches_previous" if clip_number > 1 else "N/A",
                 "voice_continuity_check": "verify_voice_matches_previous" if clip_number > 1 else "establish_voice_reference"
             },
@@ -342,7 +417,9 @@ CRITICAL:
             "veo_prompt": self._build_veo_prompt(
                 master=master_json,
                 dialogue=dialogue_text,
-                clip_num=clip_number
+                clip_num=clip_number,
+                template=veo_prompt_template,
+                word_count=word_count
             ),
             
             # Keyframes
@@ -359,10 +436,37 @@ CRITICAL:
         self,
         master: Dict[str, Any],
         dialogue: str,
-        clip_num: int
+        clip_num: int,
+        template: Optional[Tuple[str, ...]] = None,
+        word_count: Optional[int] = None
     ) -> str:
         """
         Builds VEO prompt programmatically.
+        Pass fragments from _build_veo_prompt_template to reuse them across clips.
+        """
+        if template is None:
+            template = self._build_veo_prompt_template(master)
+        if word_count is None:
+            word_count = len(dialogue.split())
+        
+        duration = word_count / master["timing_config"]["words_per_second"]
+        lock_target = "Clip 1 (establish reference)" if clip_num == 1 else "Clip 1 (LOCKED)"
+        
+        return "".join((
+            template[0], str(clip_num),
+            template[1], dialogue,
+            template[2], str(word_count),
+            template[3], f"{duration:.1f}",
+            template[4], lock_target,
+            template[5], lock_target,
+            template[6]
+        ))
+    
+    def _build_veo_prompt_template(self, master: Dict[str, Any]) -> Tuple[str, ...]:
+        """
+        Renders everything in the VEO prompt that is identical for all clips of a run.
+        Returns the literal fragments around the per-clip fields, in the order
+        clip number, dialogue, word count, duration, face lock, voice lock.
         """
         
         person = master["person_identity"]
@@ -390,8 +494,10 @@ CRITICAL:
         else:
             music_section = "🎵 BACKGROUND MUSIC: Disabled"
         
-        prompt = f"""
-🎬 SPEAKING PERSON VIDEO - CLIP {clip_num}/{total_clips}
+        return (
+            "🎬 SPEAKING PERSON VIDEO - CLIP ",
+            
+            f'''/{total_clips}
 
 {rules_text}
 
@@ -406,20 +512,30 @@ CRITICAL:
 
 🎙️ DIALOGUE (MUST COMPLETE IN 7.9 SECONDS):
 
-"{dialogue}"
+"''',
+            
+            '''"
 
 ⏱️ TIMING:
-- Word Count: {len(dialogue.split())} words
+- Word Count: ''',
+            
+            f""" words
 - Speed: {timing['words_per_second']} words/second
-- Estimated Duration: {len(dialogue.split()) / timing['words_per_second']:.1f} seconds
+- Estimated Duration: """,
+            
+            """ seconds
 - MUST complete by: 7.9 seconds
 - Clip total: 8.0 seconds
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 🔒 CONSISTENCY LOCKS:
-- Face: 99% similarity to {"Clip 1 (establish reference)" if clip_num == 1 else "Clip 1 (LOCKED)"}
-- Voice: 99% similarity to {"Clip 1 (establish reference)" if clip_num == 1 else "Clip 1 (LOCKED)"}
+- Face: 99% similarity to """,
+            
+            """
+- Voice: 99% similarity to """,
+            
+            """
 - Background: Pixel-perfect match across all clips
 - Lighting: Identical across all clips
 
@@ -427,10 +543,8 @@ CRITICAL:
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-✅ GENERATE: Follow all rules strictly, complete dialogue in 7.9s
-""".strip()
-        
-        return prompt
+✅ GENERATE: Follow all rules strictly, complete dialogue in 7.9s"""
+        )
     
     def _generate_keyframes(
         self,
@@ -453,15 +567,7 @@ CRITICAL:
                     "expression": "neutral_to_natural"
                 }
             },
-            {
-                "time": 7.9,
-                "action": "dialogue_completion",
-                "properties": {
-                    "description": "Dialogue must complete by this point",
-                    "voice_level": "natural_completion",
-                    "prepare_transition": True
-                }
-            },
+            _DIALOGUE_COMPLETION_KEYFRAME,
             {
                 "time": duration - 0.1,
                 "action": "segment_end",
@@ -475,37 +581,46 @@ CRITICAL:
         
         return keyframes
     
-    def _get_transition_cue(self, dialogue: str, clip_num: int, total_clips: int) -> str:
+    def _get_transition_cue(
+        self,
+        dialogue: str,
+        clip_num: int,
+        total_clips: int,
+        last_sentence: Optional[str] = None
+    ) -> str:
         """
         Determines transition cue.
         """
         if clip_num == total_clips:
             return "Final segment - natural close"
         
-        last_sentence = self._get_last_sentence(dialogue)
+        if last_sentence is None:
+            last_sentence = self._get_last_sentence(dialogue)
         return f"Continue from: {last_sentence}"
     
     def _get_last_sentence(self, text: str) -> str:
         """
         Extracts last sentence.
         """
-        sentences = re.split(r'[.!?]+', text.strip())
-        sentences = [s.strip() for s in sentences if s.strip()]
-        return sentences[-1] if sentences else text.strip()
+        # Drop trailing terminators/whitespace, then scan back to the previous one
+        trimmed = text.rstrip()
+        while trimmed.endswith(('.', '!', '?')):
+            trimmed = trimmed.rstrip('.!?').rstrip()
+        
+        if not trimmed:
+            return text.strip()
+        
+        start = max(trimmed.rfind('.'), trimmed.rfind('!'), trimmed.rfind('?'))
+        return trimmed[start + 1:].strip()
     
-    def _clean_json_response(self, response: str) -> str:
+    def _parse_json_response(self, response: str) -> Dict[str, Any]:
         """
-        Cleans LLM response to extract valid JSON.
+        Parses the first JSON object in an LLM response.
+        Markdown fences and any text before/after the object are ignored.
         """
-        response = re.sub(r'```json\s*', '', response)
-        response = re.sub(r'```\s*', '', response)
-        
-        match = re.search(r'\{', response)
-        if match:
-            response = response[match.start():]
-        
-        match = re.search(r'\}[^}]*$', response)
-        if match:
-            response = response[:match.end()]
+        start = response.find('{')
+        if start == -1:
+            raise ValueError("No JSON object found in response")
         
-        return response.strip()
+        parsed, _ = _JSON_DECODER.raw_decode(response, start)
+        return parsed
@@ -0,0 +1,19 @@
+"""
+Groq Client
+===========
+Shared Groq clients, one per API key and retry setting.
+Each client owns an httpx connection pool, so reusing it saves a new
+TCP/TLS handshake for every builder or generator created.
+"""
+
+from functools import lru_cache
+from groq import Groq
+
+
+DEFAULT_MAX_RETRIES = 2  # Groq SDK default
+
+
+@lru_cache(maxsize=4)
+def get_groq_client(api_key: str, max_retries: int = DEFAULT_MAX_RETRIES) -> Groq:
+    """Returns the shared Groq client for an API key, creating it once."""
+    return Groq(api_key=api_key, max_retries=max_retries)
@@ -0,0 +1,31 @@
+"""
+Gunicorn Configuration
+======================
+Production server settings: gunicorn -c gunicorn.conf.py app:app
+
+The app is I/O bound (it mostly waits on Groq), so gevent workers let one
+process keep many requests in flight. The gevent worker monkey-patches the
+standard library itself before app.py is imported.
+"""
+
+import os
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5001')}"
+
+worker_class = "gevent"
+worker_connections = int(os.getenv("WORKER_CONNECTIONS", "1000"))
+
+# Generation jobs and caches live in process memory, so /api/jobs/<job_id>
+# polling only works with a single worker; scale with worker_connections.
+# (Not WEB_CONCURRENCY: Heroku sets that automatically per dyno size.)
+workers = int(os.getenv("GUNICORN_WORKERS", "1"))
+
+# Master + clip generation can take a while on slow Groq responses
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
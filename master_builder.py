@@ -7,21 +7,110 @@ All rules come from rules.py (immutable).
 """
 
 import json
+import logging
 import re
 from typing import Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from groq import Groq
+from groq_client import get_groq_client
+from response_cache import ResponseCache, cached_chat_completion
 from rules import get_immutable_rules, VEOConsistencyRules, calculate_words_for_speed
 
+logger = logging.getLogger(__name__)
+
+
+# Precompiled pattern for the name fallback
+_NAME_INTRO_RE = re.compile(r"(?:I'm|I am|My name is)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)")
+
+# The rules never change at runtime, so the section mapping is built once
+IMMUTABLE_RULES = get_immutable_rules()
+
+# Fixed master sections, shared by every master (read-only, only serialized)
+CONTINUITY_SETTINGS = {
+    "narrative_flow": "connected_story",
+    "transition_style": "seamless",
+    "maintain_across_clips": [
+        "person_identity",
+        "face_appearance",
+        "voice_characteristics",
+        "visual_settings",
+        "audio_profile",
+        "background",
+        "lighting",
+        "camera_setup",
+        "background_music_settings"
+    ]
+}
+
+QUALITY_REQUIREMENTS = {
+    "minimum_face_similarity": 0.99,
+    "minimum_voice_similarity": 0.99,
+    "lip_sync_accuracy": "frame_perfect",
+    "transition_smoothness": "invisible_cuts",
+    "audio_video_sync": "perfect",
+    "voice_consistency_check": "REQUIRED",
+    "reject_if_any_rule_violated": True
+}
+
+# Bump whenever _parse_person_details changes, so cached results are re-validated
+PERSON_DETAILS_PARSER_VERSION = "v3"
+
+# Required person detail fields and their JSON types
+# (speaking_style is defaulted before validation when the LLM omits it)
+PERSON_DETAIL_TYPES = {
+    "name": str,
+    "role": str,
+    "tone": str,
+    "appearance": dict,
+    "key_points": list,
+    "speaking_style": str
+}
+
+# Background music settings for both toggle states, built once
+_BASE_MUSIC_CONFIG = VEOConsistencyRules.AUDIO_PROFILE["background_audio"]["music"]
+
+BACKGROUND_MUSIC_ENABLED = {
+    **_BASE_MUSIC_CONFIG,
+    "enabled": True,
+    "type": "ambient_subtle",
+    "genre": "ambient_subtle",
+    "volume_db": -40,
+    "volume_percentage": 0.15,
+    "description": "Subtle ambient background music at 15% volume (-40dB)"
+}
+
+BACKGROUND_MUSIC_DISABLED = {
+    **_BASE_MUSIC_CONFIG,
+    "enabled": False,
+    "type": "none",
+    "volume_db": -100,
+    "volume_percentage": 0.0,
+    "description": "No background music"
+}
+
+
+def dump_json(data: Dict[str, Any], indent: Optional[int] = 2) -> str:
+    """Serializes a generated JSON file; indent=None writes it compact"""
+    if indent is None:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return json.dumps(data, indent=indent, ensure_ascii=False)
+
 
 class MasterJSONBuilder:
     """
     Builds master.json with locked rules + user-specific person details.
     """
     
-    def __init__(self, api_key: str, model: str = "llama-3.3-70b-versatile"):
-        self.client = Groq(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "llama-3.3-70b-versatile",
+        client: Optional[Groq] = None,
+        cache: Optional[ResponseCache] = None
+    ):
+        self.client = client or get_groq_client(api_key)
         self.model = model
+        self.cache = cache
     
     def build_master(
         self,
@@ -40,27 +129,27 @@ class MasterJSONBuilder:
         """
         
         # Step 1: Calculate speed-based timing
-        print(f"⚡ Calculating timing for speed: {speed}")
+        logger.info("⚡ Calculating timing for speed: %s", speed)
         speed_config = calculate_words_for_speed(speed)
         
         # Step 2: Extract person details using LLM
-        print("🔍 Extracting person details from description...")
+        logger.info("🔍 Extracting person details from description...")
         person_details = self._extract_person_details(user_description)
         
         # Override tone if user provided one
         if user_tone:
-            print(f"🎙️  Using user-selected tone: {user_tone}")
+            logger.info("🎙️  Using user-selected tone: %s", user_tone)
             person_details['tone'] = user_tone
         else:
-            print(f"🎙️  Using AI-inferred tone: {person_details.get('tone', 'professional')}")
+            logger.info("🎙️  Using AI-inferred tone: %s", person_details.get('tone', 'professional'))
         
-        # Step 3: Get immutable rules from rules.py
-        print("🔒 Loading immutable VEO rules...")
-        immutable_rules = get_immutable_rules()
+        # Step 3: Get immutable rules from rules.py (bound once at import)
+        logger.info("🔒 Loading immutable VEO rules...")
+        immutable_rules = IMMUTABLE_RULES
         
         # Step 4: Apply background preset
         if background_preset == "keep_original":
-            print("🎨 Keeping original background from reference image")
+            logger.info("🎨 Keeping original background from reference image")
             background_config = {
                 "type": "keep_original",
                 "source": "reference_image",
@@ -70,7 +159,7 @@ class MasterJSONBuilder:
             }
         elif background_preset == "custom":
             if background_custom:
-                print(f"🎨 Using custom background: {background_custom[:50]}...")
+                logger.info("🎨 Using custom background: %s...", background_custom[:50])
                 background_config = {
                     "type": "custom_description",
                     "description": background_custom,
@@ -78,7 +167,7 @@ class MasterJSONBuilder:
                     "user_provided": True
                 }
             else:
-                print("⚠️  No custom description provided, keeping original")
+                logger.warning("⚠️  No custom description provided, keeping original")
                 background_config = {
                     "type": "keep_original",
                     "source": "reference_image",
@@ -87,14 +176,14 @@ class MasterJSONBuilder:
                     "extract_from": reference_image_path
                 }
         else:
-            print(f"🎨 Applying background preset: {background_preset}")
+            logger.info("🎨 Applying background preset: %s", background_preset)
             background_config = self._apply_background_preset(immutable_rules, background_preset)
         
         # Step 5: Configure background music settings
         background_music_config = self._get_background_music_config(background_music)
         
         # Step 6: Build master JSON
-        print("🏗️  Building master JSON...")
+        logger.info("🏗️  Building master JSON...")
         master = {
             "project_metadata": {
                 "type": "speaking_person_video",
@@ -103,12 +192,12 @@ class MasterJSONBuilder:
                 "clip_duration_seconds": 8,
                 "total_duration_seconds": num_clips * 8,
                 "speaking_speed": speed,
-                "speed_config": speed_config,
+                "speed_config": dict(speed_config),
                 "background_music_enabled": background_music,
                 "background_preset": background_preset,
                 "background_custom": background_custom if background_custom else None,
                 "has_additional_instructions": bool(additional_instructions),
-                "created_at": datetime.utcnow().isoformat(),
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
                 "generator": "VEO_JSON_Backend_v1.0"
             },
             
@@ -131,73 +220,59 @@ class MasterJSONBuilder:
                 "instructions": additional_instructions if additional_instructions else None,
                 "apply_to_all_clips": True,
                 "description": "User-provided specific requirements (clothing, styling, modifications, etc.)"
-            },
-            
-            **immutable_rules,
-            
-            "visual_settings": {
-                **immutable_rules["visual_settings"],
-                "background": background_config
-            },
-            
-            "timing_config": {
-                **immutable_rules["timing_config"],
-                "selected_speed": speed,
-                "words_per_second": speed_config["words_per_second"],
-                "target_words_per_clip": speed_config["target_words"],
-                "min_words_per_clip": speed_config["min_words"],
-                "max_words_per_clip": speed_config["max_words"],
-                "speed_label": speed_config["speed_label"],
-                "speed_description": speed_config["speed_description"]
-            },
-            
-            "audio_profile": {
-                **immutable_rules["audio_profile"],
-                "background_audio": {
-                    **immutable_rules["audio_profile"]["background_audio"],
-                    "music": background_music_config
-                }
-            },
-            
-            "continuity_settings": {
-                "narrative_flow": "connected_story",
-                "transition_style": "seamless",
-                "maintain_across_clips": [
-                    "person_identity",
-                    "face_appearance",
-                    "voice_characteristics",
-                    "visual_settings",
-                    "audio_profile",
-                    "background",
-                    "lighting",
-                    "camera_setup",
-                    "background_music_settings"
-                ]
-            },
-            
-            "quality_requirements": {
-                "minimum_face_similarity": 0.99,
-                "minimum_voice_similarity": 0.99,
-                "lip_sync_accuracy": "frame_perfect",
-                "transition_smoothness": "invisible_cuts",
-                "audio_video_sync": "perfect",
-                "voice_consistency_check": "REQUIRED",
-                "reject_if_any_rule_violated": True
             }
         }
         
-        print(f"✅ Master JSON built successfully!")
-        print(f"   Tone: {person_details['tone'].title()}")
-        print(f"   Speed: {speed_config['speed_label']} ({speed_config['words_per_second']} words/sec)")
+        # Immutable rule sections are shared by reference; only the sections that
+        # carry per-request values are rebuilt (in place, so key order is kept)
+        master.update(immutable_rules)
         
-        if background_preset == "keep_original":
-            print(f"   Background: Original (from image)")
-        elif background_preset == "custom":
-            print(f"   Background: Custom - {background_custom[:50] if background_custom else 'None'}...")
-        else:
-            print(f"   Background: {background_preset.replace('_', ' ').title()}")
+        master["visual_settings"] = {
+            **immutable_rules["visual_settings"],
+            "background": background_config
+        }
+        
+        master["timing_config"] = {
+            **immutable_rules["timing_config"],
+            "selected_speed": speed,
+            "words_per_second": speed_config["words_per_second"],
+            "target_words_per_clip": speed_config["target_words"],
+            "min_words_per_clip": speed_config["min_words"],
+            "max_words_per_clip": speed_config["max_words"],
+            "speed_label": speed_config["speed_label"],
+            "speed_description": speed_config["speed_description"]
+        }
+        
+        audio_profile = immutable_rules["audio_profile"]
+        master["audio_profile"] = {
+            **audio_profile,
+            "background_audio": {
+                **audio_profile["background_audio"],
+                "music": background_music_config
+            }
+        }
         
-        print(f"   Background Music: {'Enabled (15% volume)' if background_music else 'Disabled'}")
+        master["continuity_settings"] = CONTINUITY_SETTINGS
+        master["quality_requirements"] = QUALITY_REQUIREMENTS
+        
+        # The summary is INFO-only; skip building it when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            if background_preset == "keep_original":
+                background_label = "Original (from image)"
+            elif background_preset == "custom":
+                background_label = f"Custom - {background_custom[:50] if background_custom else 'None'}..."
+            else:
+                background_label = background_preset.replace('_', ' ').title()
+            
+            logger.info(
+                "✅ Master JSON built successfully! Tone: %s | Speed: %s (%s words/sec) | "
+                "Background: %s | Background Music: %s",
+                person_details['tone'].title(),
+                speed_config['speed_label'],
+                speed_config['words_per_second'],
+                background_label,
+                'Enabled (15% volume)' if background_music else 'Disabled'
+            )
         
         return master
     
@@ -210,7 +285,7 @@ class MasterJSONBuilder:
         presets = immutable_rules["visual_settings"]["background_presets"]
         
         if preset_name not in presets:
-            print(f"⚠️  Unknown preset '{preset_name}', using default")
+            logger.warning("⚠️  Unknown preset '%s', using default", preset_name)
             preset_name = "professional_gradient"
         
         preset = presets[preset_name].copy()
@@ -221,27 +296,7 @@ class MasterJSONBuilder:
     
     def _get_background_music_config(self, enabled: bool) -> Dict[str, Any]:
         """Returns background music configuration"""
-        base_config = VEOConsistencyRules.AUDIO_PROFILE["background_audio"]["music"].copy()
-        
-        if enabled:
-            return {
-                **base_config,
-                "enabled": True,
-                "type": "ambient_subtle",
-                "genre": "ambient_subtle",
-                "volume_db": -40,
-                "volume_percentage": 0.15,
-                "description": "Subtle ambient background music at 15% volume (-40dB)"
-            }
-        else:
-            return {
-                **base_config,
-                "enabled": False,
-                "type": "none",
-                "volume_db": -100,
-                "volume_percentage": 0.0,
-                "description": "No background music"
-            }
+        return BACKGROUND_MUSIC_ENABLED if enabled else BACKGROUND_MUSIC_DISABLED
     
     def _extract_person_details(self, user_description: str) -> Dict[str, Any]:
         """Uses LLM to extract person details from description"""
@@ -278,7 +333,11 @@ CRITICAL: Return ONLY valid JSON. No markdown, no explanations, no extra text.
 """
         
         try:
-            response = self.client.chat.completions.create(
+            return cached_chat_completion(
+                self.client,
+                self.cache,
+                self._parse_person_details,
+                PERSON_DETAILS_PARSER_VERSION,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You extract person details and return ONLY valid JSON. No markdown formatting."},
@@ -288,40 +347,43 @@ CRITICAL: Return ONLY valid JSON. No markdown, no explanations, no extra text.
                 max_tokens=500
             )
             
-            raw_response = response.choices[0].message.content
-            cleaned = self._clean_json_response(raw_response)
-            person_details = json.loads(cleaned)
-            
-            required_fields = ["name", "role", "tone", "appearance", "key_points"]
-            for field in required_fields:
-                if field not in person_details:
-                    raise ValueError(f"Missing required field: {field}")
-            
-            return person_details
-            
         except Exception as e:
-            print(f"⚠️  Error extracting person details: {e}")
-            print("Using fallback default person details...")
+            logger.warning("⚠️  Error extracting person details: %s. Using fallback default person details...", e)
             return self._fallback_person_details(user_description)
     
+    def _parse_person_details(self, raw_response: str) -> Dict[str, Any]:
+        """Parses and validates the person details JSON returned by the LLM"""
+        person_details = json.loads(self._clean_json_response(raw_response))
+        if not isinstance(person_details, dict):
+            raise ValueError("Person details must be a JSON object")
+        
+        person_details.setdefault("speaking_style", "clear and articulate")
+        
+        for field, expected_type in PERSON_DETAIL_TYPES.items():
+            if field not in person_details:
+                raise ValueError(f"Missing required field: {field}")
+            if not isinstance(person_details[field], expected_type):
+                raise ValueError(f"Field '{field}' must be {expected_type.__name__}")
+        
+        if not all(isinstance(point, str) for point in person_details["key_points"]):
+            raise ValueError("Field 'key_points' must be a list of strings")
+        
+        return person_details
+    
     def _clean_json_response(self, response: str) -> str:
         """Cleans LLM response to extract valid JSON"""
-        response = re.sub(r'```json\s*', '', response)
-        response = re.sub(r'```\s*', '', response)
-        
-        match = re.search(r'\{', response)
-        if match:
-            response = response[match.start():]
+        # Markdown fences sit outside the outermost braces, so slicing drops them
+        start = response.find('{')
+        end = response.rfind('}')
         
-        match = re.search(r'\}[^}]*$', response)
-        if match:
-            response = response[:match.end()]
+        if start != -1 and end > start:
+            return response[start:end + 1]
         
         return response.strip()
     
     def _fallback_person_details(self, description: str) -> Dict[str, Any]:
         """Fallback person details if LLM extraction fails"""
-        name_match = re.search(r"(?:I'm|I am|My name is)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)", description)
+        name_match = _NAME_INTRO_RE.search(description)
         name = name_match.group(1) if name_match else "Speaker"
         
         return {
@@ -342,10 +404,15 @@ CRITICAL: Return ONLY valid JSON. No markdown, no explanations, no extra text.
             "speaking_style": "clear and articulate"
         }
     
-    def save_master_json(self, master: Dict[str, Any], output_path: str = "master.json") -> str:
-        """Saves master JSON to file"""
+    def save_master_json(
+        self,
+        master: Dict[str, Any],
+        output_path: str = "master.json",
+        indent: Optional[int] = 2
+    ) -> str:
+        """Saves master JSON to file (compact when indent is None)"""
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(master, f, indent=2, ensure_ascii=False)
+            f.write(dump_json(master, indent))
         
-        print(f"💾 Master JSON saved to: {output_path}")
+        logger.info("💾 Master JSON saved to: %s", output_path)
         return output_path
@@ -0,0 +1,161 @@
+"""
+Response Cache
+==============
+Persistent SQLite cache for expensive LLM results.
+Entries are keyed by input hash + prompt version and expire after a TTL.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600  # 7 days
+
+# prompt_version prefix used for chat completions; the prompt itself is hashed
+# into the key, so editing a prompt never serves stale entries, and the caller's
+# parser version is appended so tightening a parser drops older results
+CHAT_CACHE_NAMESPACE = "chat_completion"
+
+
+class ResponseCache:
+    """
+    Stores JSON-serializable LLM results in a local SQLite database.
+    """
+
+    def __init__(self, db_path: str = "cache.db", ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    input_hash TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    response_json TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_llm_cache_key
+                ON llm_cache (input_hash, prompt_version)
+            """)
+
+    def get(self, input_hash: str, prompt_version: str) -> Optional[Any]:
+        """
+        Returns the cached value, or None on miss/expiry.
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT response_json FROM llm_cache "
+                    "WHERE input_hash = ? AND prompt_version = ? AND expires_at > ?",
+                    (input_hash, prompt_version, time.time())
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("⚠️  Cache read failed: %s", e)
+            return None
+
+        return json.loads(row[0]) if row else None
+
+    def set(self, input_hash: str, prompt_version: str, value: Any) -> None:
+        """
+        Stores a value, replacing any previous entry for the same key.
+        """
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache "
+                    "(input_hash, prompt_version, response_json, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (input_hash, prompt_version, json.dumps(value, ensure_ascii=False), now, now + self.ttl_seconds)
+                )
+        except sqlite3.Error as e:
+            logger.warning("⚠️  Cache write failed: %s", e)
+
+    def purge_expired(self) -> int:
+        """
+        Deletes expired entries so the database does not grow without bound.
+        Returns the number of rows removed.
+        """
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.execute(
+                    "DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),)
+                )
+        except sqlite3.Error as e:
+            logger.warning("⚠️  Cache purge failed: %s", e)
+            return 0
+
+        return cursor.rowcount
+
+
+def _log_usage(response: Any) -> None:
+    """
+    Logs token usage, including provider-side cached prompt tokens when the
+    API reports them (older SDKs/models omit prompt_tokens_details).
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None) if details is not None else None
+    logger.info(
+        "🧮 LLM tokens: prompt=%s (cached=%s) completion=%s",
+        getattr(usage, "prompt_tokens", None),
+        cached_tokens if cached_tokens is not None else "n/a",
+        getattr(usage, "completion_tokens", None)
+    )
+
+
+def chat_request_key(**request: Any) -> str:
+    """
+    Returns a stable SHA-256 key for a chat completion request
+    (model, messages, temperature, max_tokens, ...).
+    """
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached_chat_completion(
+    client: Any,
+    cache: Optional[ResponseCache],
+    parse: Callable[[str], Any],
+    parse_version: str,
+    **request: Any
+) -> Any:
+    """
+    Runs a chat completion and returns parse(content), serving repeats of the
+    same request from cache. Only results that parse successfully are stored,
+    so a malformed response is retried next time instead of being pinned.
+    Bump parse_version whenever parse changes what it accepts or returns.
+    Without a cache this is a plain API call.
+    """
+    key = chat_request_key(**request) if cache is not None else None
+    version = f"{CHAT_CACHE_NAMESPACE}:{parse_version}"
+
+    if cache is not None:
+        cached = cache.get(key, version)
+        if cached is not None:
+            logger.info("⚡ LLM cache hit (%s)", key[:12])
+            return cached
+
+    response = client.chat.completions.create(**request)
+    _log_usage(response)
+    result = parse(response.choices[0].message.content)
+
+    if cache is not None:
+        cache.set(key, version, result)
+
+    return result
@@ -4,163 +4,231 @@ Resume Parser for VEO Video Generation
 Parses PDF/DOCX resumes and extracts structured data for dialogue generation.
 """
 
+import io
 import re
 import json
-from typing import Dict, Any, List, Optional
-from datetime import datetime
-import PyPDF2
+import logging
+import threading
+from typing import Dict, Any, List, NamedTuple, Optional, Union, BinaryIO
+from datetime import datetime, timezone
+import pypdfium2 as pdfium
 import docx
 from groq import Groq
+from groq_client import get_groq_client
+from response_cache import ResponseCache, cached_chat_completion
 
+logger = logging.getLogger(__name__)
 
-class ResumeParser:
-    """
-    Parses resume files (PDF/DOCX) and extracts structured information.
-    """
-    
-    def __init__(self, api_key: str, model: str = "llama-3.3-70b-versatile"):
-        self.client = Groq(api_key=api_key)
-        self.model = model
-    
-    def parse_file(self, file_path: str) -> Dict[str, Any]:
-        """
-        Parses resume file and returns structured data.
-        """
-        
-        # Extract text based on file type
-        if file_path.lower().endswith('.pdf'):
-            raw_text = self._extract_pdf_text(file_path)
-        elif file_path.lower().endswith('.docx'):
-            raw_text = self._extract_docx_text(file_path)
-        else:
-            raise ValueError("Unsupported file format. Use PDF or DOCX.")
-        
-        # Use LLM to extract structured data
-        structured_data = self._extract_structured_data(raw_text)
-        
-        structured_data['raw_text'] = raw_text
-        structured_data['parsed_at'] = datetime.utcnow().isoformat()
-        
-        return structured_data
-    
-    def _extract_pdf_text(self, file_path: str) -> str:
-        """Extract text from PDF file."""
-        text = ""
-        
-        try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-        except Exception as e:
-            raise Exception(f"Error reading PDF: {str(e)}")
-        
-        return text.strip()
-    
-    def _extract_docx_text(self, file_path: str) -> str:
-        """Extract text from DOCX file."""
-        try:
-            doc = docx.Document(file_path)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        except Exception as e:
-            raise Exception(f"Error reading DOCX: {str(e)}")
-        
-        return text.strip()
-    
-    def _extract_structured_data(self, text: str) -> Dict[str, Any]:
-        """
-        Uses LLM to extract structured data from resume text.
-        """
-        
-        prompt = f"""
-Extract information from this resume.
+# Bump whenever the extraction prompt or its parsing changes to invalidate cached results
+PROMPT_VERSION = "v3"
+
+# Supported video description focuses -> builder method name
+FOCUS_BUILDERS = {
+    "comprehensive": "_build_comprehensive_description",
+    "technical": "_build_technical_description",
+    "leadership": "_build_leadership_description",
+    "projects": "_build_projects_description"
+}
 
-RESUME TEXT:
-{text}
+
+# Static extraction instructions + schema. Kept byte-identical across calls
+# (the resume goes in the user message) so the prefix is cacheable upstream.
+RESUME_EXTRACTION_SYSTEM_PROMPT = """
+Extract information from the resume text provided by the user.
 
 RETURN ONLY THIS JSON (no markdown):
-{{
-  "personal_info": {{
+{
+  "personal_info": {
     "name": "Full name",
     "email": "email@example.com",
     "phone": "+1234567890",
     "location": "City, State/Country",
     "linkedin": "LinkedIn URL if present",
     "github": "GitHub URL if present"
-  }},
+  },
   "professional_summary": "2-3 sentence summary",
   "current_role": "Current job title",
   "years_of_experience": "X years",
   "key_strengths": ["Strength 1", "Strength 2", "Strength 3"],
-  "skills": {{
+  "skills": {
     "technical": ["Skill1", "Skill2"],
     "soft": ["Communication", "Leadership"],
     "tools": ["Tool1", "Tool2"]
-  }},
+  },
   "experience": [
-    {{
+    {
       "company": "Company Name",
       "role": "Job Title",
       "duration": "Month Year - Month Year",
       "achievements": ["Achievement 1", "Achievement 2"]
-    }}
+    }
   ],
   "education": [
-    {{
+    {
       "institution": "University Name",
       "degree": "Degree Name",
       "field": "Field of Study",
       "graduation_year": "Year"
-    }}
+    }
   ],
   "projects": [
-    {{
+    {
       "name": "Project Name",
       "description": "Brief description",
       "technologies": ["Tech1", "Tech2"]
-    }}
+    }
   ],
   "certifications": ["Cert 1", "Cert 2"],
   "achievements": ["Achievement 1"],
   "speaking_tone_suggestion": "professional/friendly/confident"
-}}
+}
 
 Return ONLY valid JSON. If section not found, use empty array [] or empty string "".
-"""
+""".strip()
+
+
+class DescriptionFields(NamedTuple):
+    """Resume fields shared by the video description builders."""
+    name: str
+    role: Optional[str]  # kept as given, even when empty
+    has_role: bool  # False when current_role is absent (builders use their default)
+    summary: str
+    top_skills: str  # first five technical skills, comma-separated
+    has_projects: bool
+
+
+# Serializes PDFium calls across request threads
+_PDFIUM_LOCK = threading.Lock()
+
+# Precompiled patterns for the regex fallback
+_NAME_LINE_RE = re.compile(r'^[A-Z][a-z]+ [A-Z][a-z]+')
+_EMAIL_RE = re.compile(r'[\w.-]+@[\w.-]+\.\w+')
+
+
+class ResumeParser:
+    """
+    Parses resume files (PDF/DOCX) and extracts structured information.
+    """
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "llama-3.3-70b-versatile",
+        client: Optional[Groq] = None,
+        cache: Optional[ResponseCache] = None
+    ):
+        self.client = client or get_groq_client(api_key)
+        self.model = model
+        self.cache = cache
+    
+    def parse_file(self, file_path: str) -> Dict[str, Any]:
+        """
+        Parses resume file and returns structured data.
+        """
+        return self._parse_source(file_path, file_path)
+    
+    def parse_bytes(self, data: bytes, filename: str) -> Dict[str, Any]:
+        """
+        Parses an in-memory resume upload without touching the filesystem.
+        """
+        return self._parse_source(io.BytesIO(data), filename)
+    
+    def _parse_source(self, source: Union[str, BinaryIO], filename: str) -> Dict[str, Any]:
+        """Extracts text from a path or binary stream and structures it."""
+        
+        # Extract text based on file type
+        if filename.lower().endswith('.pdf'):
+            raw_text = self._extract_pdf_text(source)
+        elif filename.lower().endswith('.docx'):
+            raw_text = self._extract_docx_text(source)
+        else:
+            raise ValueError("Unsupported file format. Use PDF or DOCX.")
+        
+        # Use LLM to extract structured data
+        structured_data = self._extract_structured_data(raw_text)
+        
+        structured_data['raw_text'] = raw_text
+        structured_data['parsed_at'] = datetime.now(timezone.utc).isoformat(timespec="seconds")
         
+        return structured_data
+    
+    def _extract_pdf_text(self, source: Union[str, BinaryIO]) -> str:
+        """Extract text from a PDF path or binary stream."""
+        try:
+            # PDFium is not thread-safe, so documents are processed one at a time
+            with _PDFIUM_LOCK:
+                pdf = pdfium.PdfDocument(source)
+                try:
+                    pages = []
+                    for page in pdf:
+                        textpage = page.get_textpage()
+                        pages.append(textpage.get_text_bounded())
+                        textpage.close()
+                        page.close()
+                finally:
+                    pdf.close()
+        except Exception as e:
+            raise Exception(f"Error reading PDF: {str(e)}")
+        
+        # PDFium reports line breaks as CRLF
+        return "\n".join(pages).replace("\r\n", "\n").strip()
+    
+    def _extract_docx_text(self, source: Union[str, BinaryIO]) -> str:
+        """Extract text from a DOCX path or binary stream."""
         try:
-            response = self.client.chat.completions.create(
+            doc = docx.Document(source)
+            # doc.paragraphs rebuilds its list on every access, so read it once
+            paragraphs = doc.paragraphs
+            text = "\n".join(paragraph.text for paragraph in paragraphs)
+        except Exception as e:
+            raise Exception(f"Error reading DOCX: {str(e)}")
+        
+        return text.strip()
+    
+    def _extract_structured_data(self, text: str) -> Dict[str, Any]:
+        """
+        Uses LLM to extract structured data from resume text.
+        """
+        
+        try:
+            structured_data = cached_chat_completion(
+                self.client,
+                self.cache,
+                self._parse_structured_data,
+                PROMPT_VERSION,
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": "Extract info and return ONLY valid JSON. No markdown."},
-                    {"role": "user", "content": prompt}
+                    {"role": "system", "content": RESUME_EXTRACTION_SYSTEM_PROMPT},
+                    {"role": "user", "content": f"RESUME TEXT:\n{text}"}
                 ],
                 temperature=0.3,
-                max_tokens=2000
+                max_tokens=1500
             )
-            
-            raw_response = response.choices[0].message.content
-            cleaned = self._clean_json_response(raw_response)
-            structured_data = json.loads(cleaned)
             structured_data['is_fallback'] = False
             structured_data['warnings'] = []
             
             return structured_data
             
         except Exception as e:
-            print(f"⚠️  LLM extraction failed: {e}")
+            logger.warning("⚠️  LLM extraction failed: %s", e)
             return self._fallback_extraction(text)
     
+    def _parse_structured_data(self, raw_response: str) -> Dict[str, Any]:
+        """Parse the extraction JSON; anything but an object is rejected (and not cached)."""
+        structured_data = json.loads(self._clean_json_response(raw_response))
+        if not isinstance(structured_data, dict):
+            raise ValueError("Resume data must be a JSON object")
+        
+        return structured_data
+    
     def _clean_json_response(self, response: str) -> str:
         """Clean LLM response."""
-        response = re.sub(r'```json\s*', '', response)
-        response = re.sub(r'```\s*', '', response)
-        
+        # Markdown fences sit outside the outermost braces, so slicing drops them
         start = response.find('{')
         end = response.rfind('}')
         
-        if start != -1 and end != -1:
-            response = response[start:end+1]
+        if start != -1 and end > start:
+            return response[start:end + 1]
         
         return response.strip()
     
@@ -171,11 +239,11 @@ Return ONLY valid JSON. If section not found, use empty array [] or empty string
         name = "Professional"
         for line in lines:
             if line.strip() and len(line.strip()) > 3:
-                if re.match(r'^[A-Z][a-z]+ [A-Z][a-z]+', line.strip()):
+                if _NAME_LINE_RE.match(line.strip()):
                     name = line.strip()
                     break
         
-        email_match = re.search(r'[\w.-]+@[\w.-]+\.\w+', text)
+        email_match = _EMAIL_RE.search(text)
         email = email_match.group(0) if email_match else ""
         
         return {
@@ -201,32 +269,41 @@ Return ONLY valid JSON. If section not found, use empty array [] or empty string
     def generate_video_description(self, resume_data: Dict[str, Any], focus: str = "comprehensive") -> str:
         """
         Generates video description from parsed resume data.
+        Unknown focuses fall back to the comprehensive description.
         """
-        
-        personal = resume_data.get('personal_info', {})
-        name = personal.get('name', 'Professional')
-        summary = resume_data.get('professional_summary', '')
-        role = resume_data.get('current_role', 'Professional')
-        
-        focus_templates = {
-            "comprehensive": self._build_comprehensive_description,
-            "technical": self._build_technical_description,
-            "leadership": self._build_leadership_description,
-            "projects": self._build_projects_description
+        return self.generate_video_descriptions(resume_data, [focus])[focus]
+    
+    def generate_video_descriptions(self, resume_data: Dict[str, Any], focuses: List[str]) -> Dict[str, str]:
+        """
+        Generates one description per focus, reading the resume fields only once.
+        Unknown focuses fall back to the comprehensive description.
+        """
+        fields = self._description_fields(resume_data)
+        return {
+            focus: getattr(self, FOCUS_BUILDERS.get(focus, "_build_comprehensive_description"))(fields)
+            for focus in focuses
         }
+    
+    def _description_fields(self, data: Dict[str, Any]) -> DescriptionFields:
+        """Extracts the resume fields shared by all description builders."""
+        personal = data.get('personal_info') or {}
+        skills = data.get('skills') or {}
         
-        builder = focus_templates.get(focus, self._build_comprehensive_description)
-        return builder(resume_data)
+        return DescriptionFields(
+            name=personal.get('name', 'Professional'),
+            role=data.get('current_role'),
+            has_role='current_role' in data,
+            summary=data.get('professional_summary', ''),
+            top_skills=', '.join((skills.get('technical') or [])[:5]),
+            has_projects=bool(data.get('projects'))
+        )
     
-    def _build_comprehensive_description(self, data: Dict[str, Any]) -> str:
+    def _build_comprehensive_description(self, fields: DescriptionFields) -> str:
         """Build comprehensive description."""
-        personal = data.get('personal_info', {})
-        name = personal.get('name', 'Professional')
-        role = data.get('current_role', 'Professional')
-        summary = data.get('professional_summary', '')
-        
-        skills = data.get('skills', {}).get('technical', [])
-        skills_str = ', '.join(skills[:5]) if skills else "various technologies"
+        name = fields.name
+        role = fields.role if fields.has_role else 'Professional'
+        summary = fields.summary
+        skills_str = fields.top_skills or "various technologies"
         
         description = f"""
 I'm {name}, a {role}. {summary}
@@ -240,15 +317,10 @@ I'm looking forward to opportunities where I can contribute my expertise and con
         
         return description
     
-    def _build_technical_description(self, data: Dict[str, Any]) -> str:
+    def _build_technical_description(self, fields: DescriptionFields) -> str:
         """Build technical description."""
-        personal = data.get('personal_info', {})
-        name = personal.get('name', 'Professional')
-        
-        skills = data.get('skills', {})
-        tech_skills = skills.get('technical', [])
-        
-        tech_str = ', '.join(tech_skills[:5]) if tech_skills else "modern technologies"
+        name = fields.name
+        tech_str = fields.top_skills or "modern technologies"
         
         description = f"""
 I'm {name}, a technical professional with deep expertise in {tech_str}.
@@ -262,11 +334,10 @@ I'm excited about opportunities to work on challenging technical problems.
         
         return description
     
-    def _build_leadership_description(self, data: Dict[str, Any]) -> str:
+    def _build_leadership_description(self, fields: DescriptionFields) -> str:
         """Build leadership description."""
-        personal = data.get('personal_info', {})
-        name = personal.get('name', 'Professional')
-        role = data.get('current_role', 'Leader')
+        name = fields.name
+        role = fields.role if fields.has_role else 'Leader'
         
         description = f"""
 I'm {name}, a {role} with a track record of leading successful teams and projects.
@@ -280,15 +351,12 @@ I'm looking for opportunities to bring my leadership experience to organizations
         
         return description
     
-    def _build_projects_description(self, data: Dict[str, Any]) -> str:
+    def _build_projects_description(self, fields: DescriptionFields) -> str:
         """Build projects description."""
-        personal = data.get('personal_info', {})
-        name = personal.get('name', 'Professional')
-        
-        projects = data.get('projects', [])
+        if not fields.has_projects:
+            return self._build_comprehensive_description(fields)
         
-        if not projects:
-            return self._build_comprehensive_description(data)
+        name = fields.name
         
         description = f"""
 I'm {name}, passionate about building innovative solutions through hands-on projects.
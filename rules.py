@@ -5,7 +5,9 @@ Immutable rules for VEO 3.1 video generation.
 These rules ensure 99% face and voice consistency.
 """
 
-from typing import Dict, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
 
 
 # ============ SPEED CONFIGURATIONS ============
@@ -36,8 +38,11 @@ SPEED_CONFIGS = {
     }
 }
 
+# Read-only views, so callers can share them without a defensive copy
+SPEED_CONFIGS = {speed: MappingProxyType(config) for speed, config in SPEED_CONFIGS.items()}
 
-def calculate_words_for_speed(speed: str) -> Dict[str, Any]:
+
+def calculate_words_for_speed(speed: str) -> Mapping[str, Any]:
     """
     Returns word count targets for given speed.
     
@@ -45,12 +50,9 @@ def calculate_words_for_speed(speed: str) -> Dict[str, Any]:
         speed: "1x", "1.5x", or "2x"
     
     Returns:
-        Dictionary with speed configuration
+        Read-only speed configuration (copy with dict() before mutating)
     """
-    if speed not in SPEED_CONFIGS:
-        speed = "1x"  # Default
-    
-    return SPEED_CONFIGS[speed].copy()
+    return SPEED_CONFIGS.get(speed, SPEED_CONFIGS["1x"])  # Default: 1x
 
 
 # ============ VEO CONSISTENCY RULES ============
@@ -223,10 +225,12 @@ class VEOConsistencyRules:
     }
 
 
+@lru_cache(maxsize=1)
 def get_immutable_rules() -> Dict[str, Any]:
     """
     Returns all immutable VEO rules as a dictionary.
     These rules are copied into master.json.
+    Built once and shared, so treat the result as read-only.
     """
     return {
         "face_preservation": VEOConsistencyRules.FACE_PRESERVATION,
@@ -248,6 +252,12 @@ def get_veo_prompt_requirements(speed_config: Dict[str, Any]) -> str:
     Returns:
         Formatted requirements string
     """
+    return _render_prompt_requirements(speed_config['words_per_second'], speed_config['target_words'])
+
+
+@lru_cache(maxsize=16)
+def _render_prompt_requirements(words_per_second: float, target_words: int) -> str:
+    """Renders the requirements text once per pace (only the two speed values vary)."""
     return f"""
 ⚠️ CRITICAL VEO 3.1 REQUIREMENTS - READ CAREFULLY
 
@@ -260,8 +270,8 @@ def get_veo_prompt_requirements(speed_config: Dict[str, Any]) -> str:
 ⏱️ TIMING REQUIREMENTS:
 - Clip duration: EXACTLY 8 seconds
 - Dialogue MUST complete within 7.9 seconds
-- Speaking pace: {speed_config['words_per_second']} words/second
-- Target word count: ~{speed_config['target_words']} words
+- Speaking pace: {words_per_second} words/second
+- Target word count: ~{target_words} words
 - Buffer: 0.1 seconds before clip end
 
 🎙️ VOICE PROCESSING ORDER (CRITICAL):